@@ -1,10 +1,13 @@
 import streamlit as st
-import yfinance as yf
+import streamlit.components.v1 as components
 import pandas as pd
-from pyecharts import options as opts
-from pyecharts.charts import Line
-from streamlit_echarts import st_pyecharts
+import numpy as np
+import json
+import hashlib
 from datetime import datetime
+from pathlib import Path
+from itertools import islice
+from concurrent.futures import ThreadPoolExecutor, as_completed, TimeoutError as FuturesTimeout
 
 # Page configuration
 st.set_page_config(
@@ -14,7 +17,8 @@ st.set_page_config(
     initial_sidebar_state="collapsed"
 )
 
-# Custom CSS for premium look (consistent with ValueHorizon)
+# Custom CSS for premium look (consistent with ValueHorizon) and the hero header,
+# emitted as a single markdown element
 st.markdown("""
     <style>
     @import url('https://fonts.googleapis.com/css2?family=Inter:wght@400;600;700&display=swap');
@@ -64,10 +68,8 @@ st.markdown("""
         display: none !important;
     }
     </style>
-    """, unsafe_allow_html=True)
 
-# Hero Section
-st.markdown(f"""
+<!-- Hero Section -->
 <div class="hero-container">
     <div class="hero-title">🌍 Global Stock Index Performance</div>
     <div class="hero-subtitle">전년도 마지막 종가 기준 올해 수익률 추이 (Base 100)</div>
@@ -90,38 +92,187 @@ indices = {
     'Silver': 'SI=F',
     'Copper': 'HG=F'
 }
+# Ticker -> Name, built once instead of on every fetch
+INV_INDICES = {v: k for k, v in indices.items()}
+
+# Upper bound (seconds) for the per-ticker fallback so one slow ticker can't stall the page
+FETCH_TIMEOUT = 10
+
+def _download_close(ticker, start_date, end_date):
+    import yfinance as yf
+    # Already running in our own pool; don't let yfinance spin up a nested one per ticker
+    data = yf.download(ticker, start=start_date, end=end_date, progress=False, threads=False)
+    close = data['Close']
+    # Newer yfinance keeps a (Price, Ticker) MultiIndex even for a single ticker
+    if isinstance(close, pd.DataFrame):
+        close = close.iloc[:, 0]
+    return close
+
+def _download_each(indices_dict, start_date, end_date):
+    # Fallback when the batched request fails: requests are I/O-bound, so overlap them in threads
+    results = {}
+    executor = ThreadPoolExecutor(max_workers=min(16, len(indices_dict)))
+    try:
+        futures = {
+            executor.submit(_download_close, ticker, start_date, end_date): name
+            for name, ticker in indices_dict.items()
+        }
+        for future in as_completed(futures, timeout=FETCH_TIMEOUT):
+            try:
+                results[futures[future]] = future.result()
+            except Exception:
+                continue
+    except FuturesTimeout:
+        pass
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    results = {name: s for name, s in results.items() if not s.empty}
+    if not results:
+        return pd.DataFrame()
+    # Keep the original index order regardless of completion order
+    return pd.concat(results, axis=1, sort=True)[[n for n in indices_dict if n in results]]
+
+# Yahoo serves at most ~20 symbols per batched request; larger lists are split
+YF_BATCH_SIZE = 20
+
+def _download_closes(indices_dict, start_date, end_date):
+    import yfinance as yf
+
+    tickers = iter(indices_dict.values())
+    
+    try:
+        # Download tickers in batched requests (one round-trip per batch instead of one per ticker)
+        frames = []
+        while batch := list(islice(tickers, YF_BATCH_SIZE)):
+            frames.append(yf.download(batch, start=start_date, end=end_date, group_by='column', progress=False,
+                                      threads=True))
+        data = frames[0] if len(frames) == 1 else pd.concat(frames, axis=1, sort=True)
+    except Exception:
+        data = pd.DataFrame()
+
+    if data.empty:
+        # Batched request failed or came back empty: retry ticker by ticker in parallel
+        return _download_each(indices_dict, start_date, end_date)
+
+    # Extract 'Close' prices (xs on the Price level avoids copying the block when possible)
+    if isinstance(data.columns, pd.MultiIndex):
+        all_close = data.xs('Close', axis=1, level=0)
+    else:
+        # Fallback for single ticker or different structure
+        all_close = data[['Close']] if 'Close' in data.columns else data
+        
+    # Rename columns from Ticker to Name
+    all_close = all_close.rename(columns=INV_INDICES)
+
+    # Tickers the batch silently dropped (missing or all-NaN) get one parallel retry,
+    # merged back with a single concat instead of column-by-column insertion
+    missing = {
+        name: ticker for name, ticker in indices_dict.items()
+        if name not in all_close.columns or all_close[name].isna().all()
+    }
+    if missing:
+        retried = _download_each(missing, start_date, end_date)
+        if not retried.empty:
+            all_close = pd.concat([all_close.drop(columns=retried.columns, errors='ignore'), retried], axis=1, sort=True)
+            all_close = all_close[[n for n in indices_dict if n in all_close.columns]]
+    return all_close
+
+# Per-ticker Parquet cache under st.cache_data: survives restarts, and only the trailing
+# days missing since the last fetch are requested from Yahoo
+DISK_CACHE_DIR = Path.home() / '.cache' / 'marketpulse'
+DISK_CACHE_MANIFEST = DISK_CACHE_DIR / 'manifest.json'
+# Skip the network entirely for tickers fetched this recently (seconds)
+DISK_CACHE_FRESH = 15 * 60
+
+def _read_manifest():
+    try:
+        return json.loads(DISK_CACHE_MANIFEST.read_text())
+    except (OSError, ValueError):
+        return {}
+
+def _read_cached_close(ticker):
+    try:
+        return pd.read_parquet(DISK_CACHE_DIR / f'{ticker}.parquet')['Close']
+    except Exception:
+        return None
+
+def _load_closes(indices_dict, start_date, end_date):
+    manifest = _read_manifest()
+    now = datetime.now().timestamp()
+    start_ts = pd.Timestamp(start_date)
+
+    closes = {}
+    uncached = {}
+    delta = {}
+    delta_start = end_date
+    for name, ticker in indices_dict.items():
+        entry = manifest.get(ticker, {})
+        covered = entry.get('start', end_date) <= start_date
+        # Every attempted ticker is recorded, so failed or empty fetches also wait out DISK_CACHE_FRESH
+        fresh = covered and now - entry.get('last_fetch', 0) < DISK_CACHE_FRESH
+        cached = _read_cached_close(ticker) if covered else None
+        if cached is None or cached.empty:
+            if not fresh:
+                uncached[name] = ticker
+            continue
+
+        closes[name] = cached[cached.index >= start_ts]
+        if not fresh:
+            delta[name] = ticker
+            # Re-request the last stored bar too: it may have been partial or revised since
+            delta_start = min(delta_start, cached.index[-1].strftime('%Y-%m-%d'))
+
+    # Uncached tickers need the full window; cached ones only the trailing delta.
+    # Separate batches keep a failing ticker from dragging the others back to start_date.
+    attempted = False
+    updated = {}
+    for stale, fetch_start in ((uncached, start_date), (delta, delta_start)):
+        if not stale or fetch_start >= end_date:
+            continue
+        attempted = True
+        fetched = _download_closes(stale, fetch_start, end_date)
+        for name, ticker in stale.items():
+            new = fetched[name].dropna() if name in fetched.columns else None
+            if new is not None and not new.empty:
+                old = closes.get(name)
+                merged = new if old is None else pd.concat([old, new])
+                closes[name] = updated[ticker] = merged[~merged.index.duplicated(keep='last')].sort_index()
+            manifest[ticker] = {'start': start_date, 'last_fetch': now}
+
+    if attempted:
+        try:
+            DISK_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+            for ticker, series in updated.items():
+                series.to_frame('Close').to_parquet(DISK_CACHE_DIR / f'{ticker}.parquet', compression='zstd')
+            DISK_CACHE_MANIFEST.write_text(json.dumps(manifest))
+        except (OSError, ImportError):
+            # Read-only disk or no Parquet engine: serve the download uncached
+            pass
+
+    closes = {name: s for name, s in closes.items() if not s.empty}
+    if not closes:
+        return pd.DataFrame()
+    return pd.concat(closes, axis=1, sort=True)[[n for n in indices_dict if n in closes]]
 
 @st.cache_data(ttl=3600)
 def fetch_data(indices_dict):
     today = datetime.now()
     current_year = today.year
-    start_date = datetime(current_year - 1, 12, 10).strftime('%Y-%m-%d')
+    # The prev-year baseline is the last trading day (always Dec 28-31), so a few days of
+    # lead-in are enough
+    start_date = datetime(current_year - 1, 12, 27).strftime('%Y-%m-%d')
     end_date = today.strftime('%Y-%m-%d')
     
-    tickers = list(indices_dict.values())
-    names = list(indices_dict.keys())
-    
     try:
-        # Download all tickers at once for better indexing alignment
-        data = yf.download(tickers, start=start_date, end=end_date, progress=False)
-        
-        if data.empty:
+        all_close = _load_closes(indices_dict, start_date, end_date)
+        if all_close.empty:
             return pd.DataFrame()
-            
-        # Extract 'Close' prices
-        if 'Close' in data.columns.levels[0] if isinstance(data.columns, pd.MultiIndex) else False:
-            all_close = data['Close']
-        else:
-            # Fallback for single ticker or different structure
-            all_close = data[['Close']] if 'Close' in data.columns else data
-            
-        # Rename columns from Ticker to Name
-        # Create a mapping from Ticker to Name
-        inv_indices = {v: k for k, v in indices_dict.items()}
-        all_close = all_close.rename(columns=inv_indices)
         
-        # Forward fill to handle different market holidays
-        all_close = all_close.ffill()
+        # Drop tickers with no data at all (one C-level reduction). Market-holiday gaps are
+        # left as NaN; the dashboard only forward fills the rows it actually plots
+        good = all_close.columns[all_close.notna().any().to_numpy()]
+        all_close = all_close[good]
         
         return all_close
         
@@ -129,237 +280,245 @@ def fetch_data(indices_dict):
         st.error(f"Error fetching data: {e}")
         return pd.DataFrame()
 
-with st.spinner('데이터를 불러오고 있습니다...'):
-    df = fetch_data(indices)
+# Metric card grid with the FLIP sort animation, served as a static component
+# (components/cards/index.html). Only the names/values/order props are sent per rerun.
+CARDS_COMPONENT_DIR = Path(__file__).parent / 'components' / 'cards'
+cards_component = components.declare_component('cards', path=CARDS_COMPONENT_DIR)
 
-if not df.empty:
-    current_year = datetime.now().year
-    # 1. Split data
-    prev_year_df = df[df.index.year == (current_year - 1)]
-    current_year_df = df[df.index.year == current_year]
-    
-    if not prev_year_df.empty:
-        # 2. Calculate baseline for EACH index individually (last non-NaN value of prev year)
-        # Since we already did ffill(), we can just take the last row of prev_year_df
-        last_close_prev_year = prev_year_df.iloc[-1]
-        
-        # 3. Combine for visualization (including the last day of prev year)
-        combined_df = pd.concat([prev_year_df.tail(1), current_year_df])
-        
-        # 4. Normalize to Base 100
-        normalized_df = (combined_df / last_close_prev_year) * 100
-        
-        # Drop columns that are all NaN (if any failed to download)
-        normalized_df = normalized_df.dropna(axis=1, how='all')
-        
-        # Custom Card Animation Layout
-        import json
-        original_order = list(normalized_df.columns)
-        latest_perf_series = normalized_df.iloc[-1]
-        sorted_order = latest_perf_series.sort_values(ascending=False).index.tolist()
-        
-        # 2. Generate HTML for cards
-        cards_html = ""
-        for name in original_order:
-            val = latest_perf_series[name]
-            ytd_pct = val - 100
-            trend_color = "#e63946" if ytd_pct < 0 else "#2a9d8f"
-            trend_symbol = "▼" if ytd_pct < 0 else "▲"
-            
-            # Sanitize ID: only alphanumeric
-            safe_id = "".join(filter(str.isalnum, name))
-            
-            cards_html += f"""
-            <div class="metric-card" id="card-{safe_id}" data-name="{name}">
-                <div class="metric-label">{name}</div>
-                <div class="metric-value">{val:.2f}</div>
-                <div class="metric-trend" style="color: {trend_color};">
-                    {trend_symbol} {abs(ytd_pct):.2f}%
-                </div>
-            </div>
-            """
-
-        # 3. Inject into a components.html block for reliable JS execution
-        import streamlit.components.v1 as components
-        
-        # Calculate dynamic height: more compact (~120px per row)
-        num_rows = (len(original_order) + 3) // 4
-        component_height = num_rows * 135 + 10
-
-        components.html(f"""
-            <style>
-            body {{
-                margin: 0;
-                padding: 0;
-                font-family: 'Inter', -apple-system, BlinkMacSystemFont, "Segoe UI", Roboto, Helvetica, Arial, sans-serif;
-                background-color: transparent;
-                overflow: hidden;
-            }}
-            .metrics-container {{
-                display: flex;
-                flex-wrap: wrap;
-                gap: 12px;
-                padding: 5px;
-                background-color: transparent;
-            }}
-            .metric-card {{
-                background-color: #ffffff;
-                border: 1px solid #eaeaea;
-                border-radius: 12px;
-                padding: 12px 15px;
-                width: calc(25% - 12px); /* Fixed width for uniformity */
-                box-sizing: border-box;
-                box-shadow: 0 2px 4px rgba(0,0,0,0.02);
-                display: flex;
-                flex-direction: column;
-                justify-content: center;
-                transition: all 0.25s ease;
-                /* Initial state for opacity to make entry feel smooth */
-                opacity: 0;
-                transform: scale(0.9);
-            }}
-            .metric-card.ready {{
-                opacity: 1;
-                transform: scale(1);
-            }}
-            .metric-card:hover {{
-                border-color: #007aff;
-                box-shadow: 0 8px 16px rgba(0,0,0,0.06);
-                background-color: #f9f9f9;
-            }}
-            .metric-label {{ 
-                font-size: 0.75rem; 
-                color: #888888; 
-                font-weight: 600; 
-                margin-bottom: 2px; 
-                text-transform: uppercase;
-                letter-spacing: 0.5px;
-            }}
-            .metric-value {{ 
-                font-size: 1.4rem; 
-                font-weight: 700; 
-                color: #111111; 
-                margin-bottom: 0px; 
-            }}
-            .metric-trend {{ 
-                font-size: 0.85rem; 
-                font-weight: 600; 
-            }}
-            
-            @media (max-width: 1000px) {{ .metric-card {{ width: calc(33.33% - 12px); }} }}
-            @media (max-width: 700px) {{ .metric-card {{ width: calc(50% - 12px); }} }}
-            @media (max-width: 480px) {{ .metric-card {{ width: 100%; }} }}
-            </style>
-            
-            <div class="metrics-container" id="grid">
-                {cards_html}
-            </div>
-            
-            <script>
-            window.onload = function() {{
-                const grid = document.getElementById('grid');
-                const cards = Array.from(grid.querySelectorAll('.metric-card'));
-                const sortedOrder = {json.dumps(sorted_order)};
-                
-                // Show cards
-                setTimeout(() => {{
-                    cards.forEach(c => c.classList.add('ready'));
-                }}, 50);
-
-                // Start FLIP after a delay
-                setTimeout(() => {{
-                    const firstRects = cards.map(c => c.getBoundingClientRect());
-                    const sortedCards = sortedOrder.map(name => 
-                        cards.find(c => c.getAttribute('data-name') === name)
-                    ).filter(Boolean);
-                    
-                    sortedCards.forEach(c => grid.appendChild(c));
-                    
-                    sortedCards.forEach((card, i) => {{
-                        const name = card.getAttribute('data-name');
-                        const originalIndex = cards.findIndex(c => c.getAttribute('data-name') === name);
-                        const firstRect = firstRects[originalIndex];
-                        const lastRect = card.getBoundingClientRect();
-                        
-                        const dx = firstRect.left - lastRect.left;
-                        const dy = firstRect.top - lastRect.top;
-                        
-                        if (dx === 0 && dy === 0) return;
-                        
-                        card.style.transition = 'none';
-                        card.style.transform = `translate(${{dx}}px, ${{dy}}px)`;
-                        
-                        requestAnimationFrame(() => {{
-                            card.style.transition = 'transform 1s cubic-bezier(0.34, 1.56, 0.64, 1)';
-                            card.style.transform = 'translate(0, 0)';
-                        }});
-                    }});
-                }}, 800);
-            }};
-            </script>
-        """, height=component_height)
-
-        # ECharts Visualization (Reduced spacing)
-        x_data = normalized_df.index.strftime('%Y-%m-%d').tolist()
-        
-        line = (
-            Line(init_opts=opts.InitOpts(theme="light", height="600px", width="100%"))
-            .add_xaxis(xaxis_data=x_data)
+# Cap on points per series sent to the browser; longer ranges are downsampled with LTTB
+MAX_CHART_POINTS = 500
+
+def _lttb_indices(values, n_out):
+    # Largest-Triangle-Three-Buckets over all series at once: every series shares the
+    # same x values, so pick one row per bucket that maximizes the summed triangle area
+    n = len(values)
+    if n <= n_out or n_out < 3:
+        return np.arange(n)
+    if values.ndim == 1:
+        values = values[:, None]
+
+    x = np.arange(n, dtype=float)
+    edges = np.linspace(1, n - 1, n_out - 1).astype(int)
+    keep = np.empty(n_out, dtype=np.intp)
+    keep[0], keep[-1] = 0, n - 1
+
+    a = 0
+    for i in range(n_out - 2):
+        lo, hi = edges[i], edges[i + 1]
+        # Average point of the next bucket (the last point for the final bucket)
+        nlo, nhi = (edges[i + 1], edges[i + 2]) if i + 2 < len(edges) else (n - 1, n)
+        avg_x = x[nlo:nhi].mean()
+        avg_y = values[nlo:nhi].mean(axis=0)
+
+        area = np.abs(
+            (x[a] - avg_x) * (values[lo:hi] - values[a])
+            - (x[a] - x[lo:hi, None]) * (avg_y - values[a])
         )
-        
-        # 10 High Contrast Modern Colors
-        colors = [
-            '#5470c6', '#91cc75', '#fac858', '#ee6666', 
-            '#73c0de', '#3ba272', '#fc8452', '#9a60b4',
-            '#ea7ccc', '#516b91'
-        ]
-        
-        for i, name in enumerate(normalized_df.columns):
-            line.add_yaxis(
-                series_name=name,
-                y_axis=normalized_df[name].round(2).tolist(),
-                symbol="none",
-                is_smooth=False,
-                label_opts=opts.LabelOpts(is_show=False),
-                linestyle_opts=opts.LineStyleOpts(width=2),
-                # Show label at the end of the line for easy identification
-                end_label_opts=opts.LabelOpts(
-                    is_show=True, 
-                    formatter=name, 
-                    position="right",
-                    font_size=12,
-                    font_weight="bold",
-                    color=colors[i % len(colors)]
-                )
+        area = np.nan_to_num(area, nan=0.0).sum(axis=1)
+        a = lo + int(np.argmax(area))
+        keep[i + 1] = a
+    return keep
+
+# 10 High Contrast Modern Colors
+CHART_COLORS = (
+    '#5470c6', '#91cc75', '#fac858', '#ee6666', 
+    '#73c0de', '#3ba272', '#fc8452', '#9a60b4',
+    '#ea7ccc', '#516b91'
+)
+
+# ECharts is loaded straight from the CDN inside a components.html iframe,
+# so the options JSON goes to the browser without a custom-component round trip
+ECHARTS_CDN = 'https://cdn.jsdelivr.net/npm/echarts@5/dist/echarts.min.js'
+CHART_HEIGHT = 650
+
+CHART_HTML_TPL = """
+<style>body {{ margin: 0; }}</style>
+<div id="index-chart" style="width: 100%; height: {height}px;"></div>
+<script src="{cdn}"></script>
+<script>
+const chart = echarts.init(document.getElementById('index-chart'), 'light');
+chart.setOption({options});
+window.addEventListener('resize', () => chart.resize());
+</script>
+"""
+
+# Chart construction is pure Python; cache the rendered HTML so reruns on the same
+# dataset skip rebuilding the pyecharts object tree. Only the small fingerprint is
+# hashed: the leading underscore tells Streamlit not to hash the frame itself
+@st.cache_data(max_entries=8)
+def build_chart(fingerprint, _chart_df, colors):
+    from pyecharts import options as opts
+    from pyecharts.charts import Line
+
+    # Epoch milliseconds for a time axis: no per-row date formatting
+    # (cast through datetime64[ms]: the index's own resolution varies across pandas versions)
+    x_data = _chart_df.index.values.astype('datetime64[ms]').astype(np.int64).tolist()
+    # One vectorized round and one bulk tolist() instead of a round/tolist per column
+    # (widened back to float64 first so the rounded values serialize as short decimals)
+    columns_lists = np.round(_chart_df.to_numpy(dtype=np.float64), 2).T.tolist()
+    series_data = list(zip(_chart_df.columns, columns_lists))
+
+    line = (
+        Line(init_opts=opts.InitOpts(theme="light", height="600px", width="100%"))
+        .add_xaxis(xaxis_data=x_data)
+    )
+    # Timestamps are midnight UTC; render them in UTC so dates don't shift a day west of Greenwich
+    line.options["useUTC"] = True
+    
+    color_map = {name: colors[i % len(colors)] for i, (name, _) in enumerate(series_data)}
+
+    for name, values in series_data:
+        line.add_yaxis(
+            series_name=name,
+            y_axis=values,
+            symbol="none",
+            is_smooth=False,
+            label_opts=opts.LabelOpts(is_show=False),
+            linestyle_opts=opts.LineStyleOpts(width=2),
+            # Show label at the end of the line for easy identification
+            end_label_opts=opts.LabelOpts(
+                is_show=True, 
+                formatter=name, 
+                position="right",
+                font_size=12,
+                font_weight="bold",
+                color=color_map[name]
             )
-            
-        line.set_global_opts(
-            title_opts=opts.TitleOpts(title="Index Performance (Base 100)", subtitle="Relative to Prev Year Close"),
-            tooltip_opts=opts.TooltipOpts(trigger="axis", axis_pointer_type="cross"),
-            legend_opts=opts.LegendOpts(is_show=False), # Hide legend as end labels are used
-            xaxis_opts=opts.AxisOpts(type_="category", boundary_gap=False),
-            yaxis_opts=opts.AxisOpts(
-                type_="value", 
-                min_="dataMin",
-                splitline_opts=opts.SplitLineOpts(is_show=True, linestyle_opts=opts.LineStyleOpts(opacity=0.3)),
-            ),
-            # Show full period (0-100%) by default
-            datazoom_opts=[opts.DataZoomOpts(is_show=True, type_="slider", range_start=0, range_end=100)],
         )
         
-        # Add MarkLine for 100 baseline
-        line.set_series_opts(
-            markline_opts=opts.MarkLineOpts(
-                data=[opts.MarkLineItem(y=100, name="Prev Year Close")],
-                linestyle_opts=opts.LineStyleOpts(type_="dashed", color="gray", opacity=0.5)
-            )
+    line.set_global_opts(
+        title_opts=opts.TitleOpts(title="Index Performance (Base 100)", subtitle="Relative to Prev Year Close"),
+        tooltip_opts=opts.TooltipOpts(trigger="axis", axis_pointer_type="cross"),
+        legend_opts=opts.LegendOpts(is_show=False), # Hide legend as end labels are used
+        xaxis_opts=opts.AxisOpts(type_="time", boundary_gap=False),
+        yaxis_opts=opts.AxisOpts(
+            type_="value", 
+            min_="dataMin",
+            splitline_opts=opts.SplitLineOpts(is_show=True, linestyle_opts=opts.LineStyleOpts(opacity=0.3)),
+        ),
+        # Show full period (0-100%) by default
+        datazoom_opts=[opts.DataZoomOpts(is_show=True, type_="slider", range_start=0, range_end=100)],
+    )
+    
+    # Add MarkLine for 100 baseline
+    line.set_series_opts(
+        markline_opts=opts.MarkLineOpts(
+            data=[opts.MarkLineItem(y=100, name="Prev Year Close")],
+            linestyle_opts=opts.LineStyleOpts(type_="dashed", color="gray", opacity=0.5)
         )
+    )
+    # pyecharts pretty-prints with indent=4; re-dump compactly to keep the iframe payload small
+    options_json = json.dumps(json.loads(line.dump_options()), separators=(',', ':'))
+    return CHART_HTML_TPL.format(height=CHART_HEIGHT, cdn=ECHARTS_CDN, options=options_json)
 
-        st_pyecharts(line, height="650px", key="index_chart")
-        
-        with st.expander("Raw Data (Normalized)"):
-            st.dataframe(normalized_df.style.format("{:.2f}"))
+# Only the session's first load can be slow; later reruns are st.cache_data hits,
+# so skip rendering a spinner for them
+if 'data_loaded' not in st.session_state:
+    with st.spinner('데이터를 불러오고 있습니다...'):
+        df = fetch_data(indices)
+    st.session_state.data_loaded = True
+else:
+    df = fetch_data(indices)
+
+def _build_dashboard(df, current_year):
+    # 1. Split data (index is sorted, so one binary search finds the year boundary)
+    split = df.index.searchsorted(pd.Timestamp(year=current_year, month=1, day=1))
+    baseline_idx = split - 1
+
+    # Pull the values out of the frame once and reuse them for both halves of the split
+    values = df.to_numpy()
+
+    # 2. Calculate baseline for EACH index individually (last non-NaN value of prev year),
+    # straight from the raw closes: position of the last valid row per column
+    prev = values[:split]
+    has_close = ~np.isnan(prev)
+    # A ticker without a prev-year close would normalize to all-NaN. One check covers both
+    # "no prev-year rows at all" and "no ticker with a baseline"
+    valid = has_close.any(axis=0)
+    if not valid.any():
+        return None
+
+    last_valid = baseline_idx - np.argmax(has_close[::-1], axis=0)
+    base = np.where(valid, prev[last_valid, np.arange(prev.shape[1])], np.nan)
+    
+    # 3. Combine for visualization (baseline row + current year) in a buffer we own
+    combined = values[baseline_idx:].copy()
+    combined[0] = base
+    columns = df.columns
+    
+    # Drop tickers without a baseline up front
+    if not valid.all():
+        combined = combined[:, valid]
+        base = base[valid]
+        columns = columns[valid]
+    
+    # 4. Normalize to Base 100 in place (plain NumPy broadcast, no label alignment or temporaries)
+    np.divide(combined, base, out=combined)
+    np.multiply(combined, 100.0, out=combined)
+    # Values are only shown to 2 decimals, so float32 halves the bytes every later pass touches.
+    # Scaling is per column, so forward filling after normalizing is equivalent and only this slice needs it
+    normalized_df = pd.DataFrame(combined.astype(np.float32), index=df.index[baseline_idx:], columns=columns).ffill()
+    
+    # Custom Card Animation Layout: props for the static cards component
+    latest_vals = normalized_df.to_numpy()[-1].astype(np.float64)
+    # Descending by latest value; a single stable C-level sort, NaN last
+    order_idx = np.argsort(-latest_vals, kind='stable')
+    cards_props = {
+        'names': list(normalized_df.columns),
+        'values': np.round(latest_vals, 4).tolist(),
+        'sorted_order': normalized_df.columns[order_idx].tolist(),
+    }
+
+    # ECharts Visualization (Reduced spacing)
+    chart_df = normalized_df
+    if len(chart_df) > MAX_CHART_POINTS:
+        chart_df = chart_df.iloc[_lttb_indices(chart_df.to_numpy(), MAX_CHART_POINTS)]
+
+    fingerprint = (
+        chart_df.shape,
+        tuple(chart_df.columns),
+        chart_df.index[0].value,
+        chart_df.index[-1].value,
+        tuple(np.round(chart_df.to_numpy()[-1].astype(np.float64), 4).tolist()),
+    )
+    chart_html = build_chart(fingerprint, chart_df, CHART_COLORS)
+
+    # Raw-data table formatting, built with the rest of the dashboard so reruns reuse it
+    table_config = {name: st.column_config.NumberColumn(format="%.2f") for name in normalized_df.columns}
+
+    return normalized_df, cards_props, chart_html, table_config
+
+# Chart + cards run as a fragment: interactions inside it rerun only this function,
+# not the data fetch above
+@st.fragment
+def render_dashboard(df):
+    today = datetime.now().date()
+
+    # Benign reruns (expander toggle, etc.) hand back the same df; reuse this session's
+    # result instead of re-splitting, normalizing and rebuilding the HTML
+    dash_key = (today.isoformat(), hashlib.blake2b(df.to_numpy().tobytes(), digest_size=8).hexdigest())
+    if st.session_state.get('dash_key') == dash_key and 'dash_cache' in st.session_state:
+        dashboard = st.session_state['dash_cache']
     else:
-        st.warning(f"전년도({current_year - 1}) 데이터를 찾을 수 없습니다.")
+        dashboard = _build_dashboard(df, today.year)
+        st.session_state['dash_key'] = dash_key
+        st.session_state['dash_cache'] = dashboard
+
+    if dashboard is None:
+        st.warning(f"전년도({today.year - 1}) 데이터를 찾을 수 없습니다.")
+        return
+
+    normalized_df, cards_props, chart_html, table_config = dashboard
+
+    cards_component(**cards_props, key="cards", default=None)
+    # Inject into a components.html block for reliable JS execution
+    components.html(chart_html, height=CHART_HEIGHT + 20)
+    
+    with st.expander("Raw Data (Normalized)"):
+        # Let the frontend format to 2 decimals instead of building a Styler every rerun
+        st.dataframe(normalized_df, column_config=table_config)
+
+if not df.empty:
+    render_dashboard(df)
 else:
     st.error("데이터를 불러오지 못했습니다.")